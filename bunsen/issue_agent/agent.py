@@ -1,28 +1,139 @@
 """Bunsen issue-agent service"""
 
-from fastapi import FastAPI, Request, HTTPException
-import hashlib
+import asyncio
+from fastapi import BackgroundTasks, FastAPI, Request, HTTPException
+from fastapi.responses import ORJSONResponse
 import hmac
+import logging
+import orjson
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import PlainTextResponse
-import uvicorn
+import threading
 
 from bunsen.shared import settings
-from bunsen.issue_agent import core
+
+logger = logging.getLogger(__name__)
 
 # Create the FastAPI application
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Encode the webhook secret once for signature verification
+_WEBHOOK_SECRET_BYTES = settings.GITHUB_WEBHOOK_SECRET.encode("utf-8")
+
+# The largest webhook payload accepted, in bytes
+MAX_PAYLOAD_SIZE = 1_000_000
+
+# The (event, action) pairs that the agents act on
+HANDLED_EVENTS = frozenset(
+    {
+        ("issues", "opened"),
+        ("issues", "labeled"),
+        ("issue_comment", "created"),
+    }
+)
+
+# The issue labels that dispatch the Beaker swe-agent
+CODING_TRIGGER_LABELS = frozenset({settings.GITHUB_CODING_TRIGGER_LABEL})
+
+# Cache the Bunsen issue-agents by installation ID
+#   The installation authentication refreshes its access token, so the cache
+#   is only bounded in size
+
+AGENT_CACHE_SIZE = 64
+_agents = {}  # {installation_id: agent}
+_agents_lock = threading.Lock()
+
+# Bound the number of agent actions running concurrently in the background
+MAX_CONCURRENT_TASKS = 8
+_tasks_semaphore = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
 
 
 def create_issue_chat_agent(installation_id: int):
-    """Creates a new instance of the Bunsen-issue-agent with the necessary
+    """Returns an instance of the Bunsen-issue-agent with the necessary
     GitHub App authentication details.
+
+    Instances are cached by installation ID, so that consecutive webhook events
+    do not re-authenticate with GitHub.
     """
-    return core.Bunsen(
+    from bunsen.issue_agent import core
+
+    with _agents_lock:
+        cached = _agents.pop(installation_id, None)
+        if cached is not None:
+            _agents[installation_id] = cached
+            return cached
+
+    bunsen = core.Bunsen(
         app_id=settings.GITHUB_APP_ID,
         private_key=settings.GITHUB_PRIVATE_KEY,
         installation_id=installation_id
     )
 
+    with _agents_lock:
+
+        # Evict the least-recently used agent
+        if len(_agents) >= AGENT_CACHE_SIZE:
+            _agents.pop(next(iter(_agents)))
+
+        _agents[installation_id] = bunsen
+
+    return bunsen
+
+
+def _run_agent_action(installation_id: int, action: str, ignore_sender: str | None = None, **kwargs):
+    """Creates, or retrieves, the Bunsen issue-agent of the installation and runs an agent action.
+
+    Agent creation authenticates with GitHub, so it runs with the action, after
+    GitHub has received a response.
+
+    Args:
+        installation_id (int): The ID of the specific installation to act on behalf of.
+        action (str): The name of the agent method to run (e.g., 'comment').
+        ignore_sender (str): The login of the event sender, to skip the action if the sender
+            is the agent itself. Defaults to None.
+        **kwargs: The keyword arguments to pass to the agent action.
+    """
+    try:
+        bunsen = create_issue_chat_agent(installation_id=installation_id)
+    except Exception as e:
+        logger.error("Could not create the Bunsen issue-agent: %s", e)
+        return
+
+    # Avoid the agent responding to its own comments
+    if ignore_sender is not None and ignore_sender == bunsen.agent_name:
+        return
+
+    getattr(bunsen, action)(**kwargs)
+
+
+async def _run_in_background(func, **kwargs):
+    """Runs a blocking agent action in the threadpool, once a concurrency slot is available.
+
+    Args:
+        func (Callable): The agent action to run.
+        **kwargs: The keyword arguments to pass to the agent action.
+    """
+    async with _tasks_semaphore:
+        await run_in_threadpool(func, **kwargs)
+
+
+def _parse_signature(signature: str) -> bytes:
+    """Parses the raw digest from the `X-Hub-Signature-256` header.
+
+    Args:
+        signature (str): The header value, e.g. 'sha256=<hex-digest>'.
+
+    Returns:
+        bytes: The digest, or empty bytes if the header is malformed.
+    """
+    algorithm, _, digest = signature.partition("=")
+    if algorithm != "sha256":
+        return b""
+    try:
+        return bytes.fromhex(digest)
+    except ValueError:
+        return b""
+
 
 @app.get("/", status_code=200, response_class=PlainTextResponse)
 def root():
@@ -35,14 +146,16 @@ def root():
 
 
 @app.post("/github-webhook")
-async def github_webhook(request: Request):
+async def github_webhook(request: Request, background_tasks: BackgroundTasks):
     """Endpoint to receive and process GitHub webhook events.
 
     This endpoint authenticates as a GitHub App using the installation ID
-    from the webhook payload.
+    from the webhook payload. The agent actions run in the background, so that
+    GitHub receives a response without waiting on the LLM.
 
     Args:
         request (Request): The incoming request object from FastAPI.
+        background_tasks (BackgroundTasks): The background tasks to run after the response is sent.
     """
 
     # Get the event type from the headers
@@ -61,20 +174,40 @@ async def github_webhook(request: Request):
             status_code=401, detail="X-Hub-Signature-256 header missing"
         )
 
-    body = await request.body()
-    secret_bytes = settings.GITHUB_WEBHOOK_SECRET.encode("utf-8")
-    mac = hmac.new(secret_bytes, msg=body, digestmod=hashlib.sha256)
-    expected_signature = "sha256=" + mac.hexdigest()
+    # Reject oversized payloads before reading and verifying the body
+    if int(request.headers.get("content-length", 0)) > MAX_PAYLOAD_SIZE:
+        raise HTTPException(
+            status_code=413, detail="Payload too large"
+        )
+
+    # Stream the body into the signature verification, aborting as soon as the
+    #   payload exceeds the size limit (e.g., chunked requests without a content-length)
 
-    if not hmac.compare_digest(expected_signature, signature):
+    mac = hmac.new(_WEBHOOK_SECRET_BYTES, digestmod="sha256")
+    body = bytearray()
+    async for chunk in request.stream():
+        if len(body) + len(chunk) > MAX_PAYLOAD_SIZE:
+            raise HTTPException(
+                status_code=413, detail="Payload too large"
+            )
+        mac.update(chunk)
+        body.extend(chunk)
+
+    if not hmac.compare_digest(mac.digest(), _parse_signature(signature)):
         raise HTTPException(
             status_code=403, detail="X-Hub-Signature-256 header is invalid"
         )
 
     # Parse the request body as JSON
-    payload = await request.json()
+    #   The body has already been streamed, so it is parsed directly
+
+    payload = orjson.loads(body)
     action = payload.get("action")
 
+    # Ignore events that the agents do not act on, before authenticating with GitHub
+    if (event_type, action) not in HANDLED_EVENTS:
+        return {"msg": f"Ignoring {event_type} event: {action}."}
+
     # Extract the necessary details from the payload
     repo_name = payload.get("repository", {}).get("full_name")
     issue_id = payload.get("issue", {}).get("number")
@@ -85,37 +218,41 @@ async def github_webhook(request: Request):
 
     # If any required information is missing, stop processing.
     if not all([installation_id, repo_name, issue_id]):
-        print("Missing required information in the webhook payload. Ignoring event.")
+        logger.info("Missing required information in the webhook payload. Ignoring event.")
         return {"msg": "Payload incomplete. Ignoring..."}
 
-    # Instantiate the agent using the new credentials.
-    try:
-        bunsen = create_issue_chat_agent(installation_id=installation_id)
-    except Exception as e:
-        print(f"Could not create the Bunsen issue-agent: {e}")
-        return {"msg": "The Bunsen issue-agent initialization failed. Ignoring..."}
-
     # Dispatch the Beaker swe-agent workflow if the issue is labeled with the coding trigger
     if event_type == "issues" and action == "labeled":
         label = payload.get("label", {}).get("name")
-        if label == settings.GITHUB_CODING_TRIGGER_LABEL:
-            print(
-                f"Label '{settings.GITHUB_CODING_TRIGGER_LABEL}' added to issue #{issue_id}."
-                " Dispatching the Beaker swe-agent workflow."
+        if label in CODING_TRIGGER_LABELS:
+            logger.info(
+                "Label '%s' added to issue #%s. Dispatching the Beaker swe-agent workflow.",
+                label, issue_id
             )
 
             # Dispatch the Beaker swe-agent workflow
-            bunsen.dispatch_coding_agent(
+            background_tasks.add_task(
+                _run_in_background,
+                _run_agent_action,
+                installation_id=installation_id,
+                action="dispatch_coding_agent",
                 repo_name=repo_name,
                 issue_id=issue_id,
             )
             return {"msg": f"Dispatched the Beaker swe-agent for issue #{issue_id}."}
 
     # Run the Bunsen issue-agent comment workflow
+    #   New comments from the agent itself are skipped once the agent is created
+
     if event_type in ["issues", "issue_comment"]:
-        if action == "opened" or (action == "created" and sender_login != bunsen.agent_name):
-            print(f"Received {event_type} event: {action}")
-            bunsen.comment(
+        if action in ["opened", "created"]:
+            logger.info("Received %s event: %s", event_type, action)
+            background_tasks.add_task(
+                _run_in_background,
+                _run_agent_action,
+                installation_id=installation_id,
+                action="comment",
+                ignore_sender=sender_login if action == "created" else None,
                 repo_name=repo_name,
                 issue_id=issue_id,
             )
@@ -124,6 +261,24 @@ async def github_webhook(request: Request):
 
 
 if __name__ == "__main__":
+    import copy
+    import os
+    import uvicorn
+    from uvicorn.config import LOGGING_CONFIG
+
+    # Configure logging
+    #   The logging configuration is applied by uvicorn within each worker process
+
+    log_config = copy.deepcopy(LOGGING_CONFIG)
+    log_config["loggers"]["bunsen"] = {"handlers": ["default"], "level": "INFO"}
 
     # Run the application with Uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    #   The event-loop and HTTP parser default to `uvloop` and `httptools` when installed
+
+    uvicorn.run(
+        "bunsen.issue_agent.agent:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", "2")),
+        log_config=log_config,
+    )
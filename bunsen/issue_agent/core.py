@@ -1,11 +1,29 @@
 """Bunsen issue-agent actions"""
 
-from github import Issue, IssueComment
+import logging
 import re
+from typing import NamedTuple
 
-from bunsen.shared import github, llms, settings
+from bunsen.shared import github, llm_cache, llms, settings
 from bunsen.issue_agent import prompts
 
+logger = logging.getLogger(__name__)
+
+# Cache LLM responses to identical prompts, e.g. on webhook redelivery
+LLM_RESPONSES = llm_cache.ResponseCache(ttl=3600)
+
+# The regex pattern to search for GitHub usernames (e.g., @username)
+USERNAME_PATTERN = re.compile(r'@([a-zA-Z0-9\-_]+)')
+
+
+class TeamMembers(NamedTuple):
+    """The user names of the members of a Github issue."""
+
+    primary: str
+    author: str
+    commenters: list[str]
+    participants: set[str]
+
 
 class Bunsen:
     """The Bunsen issue-agent handles interactions on GitHub issues.
@@ -41,201 +59,110 @@ class Bunsen:
         # Set the agent name to the Github App user
         self.agent_name = self.github_client.user
 
-    def _get_issue_data(self, repo_name: str, issue_id: int) -> tuple[Issue.Issue, list[IssueComment.IssueComment]]:
-        """Retrieves the issue and all associated comments.
+        # Set the literal mention of the agent-name (e.g., @agent-name)
+        self.mention = f"@{self.agent_name}"
+
+    def _get_issue_data(
+        self, repo_name: str, issue_id: int
+    ) -> tuple[github.IssueView, list[github.CommentView]]:
+        """Retrieves the issue and all associated comments in a single GraphQL request.
 
         Args:
             repo_name (str): The name of the GitHub repository.
             issue_id (int): The ID of the issue.
 
         Returns:
-            tuple: A tuple containing the issue object and a list of comment objects.
+            tuple: A tuple containing the issue view and a list of comment views.
         """
-        issue = self.github_client.get_issue(repo_name, issue_id)
+        issue = self.github_client.get_issue_with_comments(repo_name, issue_id)
         if not issue:
             return None, None
 
-        comments = self.github_client.get_issue_comments(repo_name, issue_id)
-        return issue, comments
-
-    def _get_issue_author(self, issue: Issue.Issue) -> str:
-        """Retrieves the author of the Github issue.
-
-        Args:
-            issue (github.Issue.Issue): The Github issue object.
-
-        Returns:
-            str: The name of the Github issue author.
-        """
-        return issue.user.login
-
-    def _get_issue_commenters(self, comments: list[IssueComment.IssueComment]) -> list[str]:
-        """Retrieves the list of Github issue commenters.
-
-        Args:
-            comments (github.IssueComment.IssueComment): The list of Github issue comment objects.
-
-        Returns:
-            list: The unique list of Github issue commenters.
-        """
-        if not comments:
-            return []
-
-        # Sort the comments from oldest to newest
-        comments = sorted(comments, key=lambda c: c.created_at)
-
-        # Retain the commenters based on the order they first commented
-        comment_authors = []
-        for comment in comments:
-            if (
-                comment.user.login not in comment_authors
-                and comment.user.login != self.agent_name  # Do not include the agent-name
-            ):
-                comment_authors.append(comment.user.login)
-
-        return comment_authors
-
-    def _get_issue_latest_commenter(self, comments: list[IssueComment.IssueComment]) -> str:
-        """Retrieves the most recent Github issue commenter who mentioned the agent.
-
-        Args:
-            comments (github.IssueComment.IssueComment): The list of Github issue comment objects.
-
-        Returns:
-            str: The name of the latest Github issue commenter who mentioned the agent.
-        """
-
-        # Define the regex pattern to search for the agent-name
-        pattern = rf'@{re.escape(self.agent_name)}'
+        return issue, issue.comments
 
-        # Filter comments that mention the agent
-        comments = [
-            comment for comment in comments if re.search(pattern, comment.body)
-        ]
-
-        # Get the most recent comment that mentions the agent
-        most_recent_comment = max(comments, key=lambda c: c.created_at)
-
-        return most_recent_comment.user.login if most_recent_comment else None
-
-    def _get_issue_participants(self, issue: Issue.Issue, comments: list[IssueComment.IssueComment]) -> list[str]:
-        """Retrieves the author of the Github issue.
-
-        Args:
-            issue (github.Issue.Issue): The Github issue object.
-            comments (github.IssueComment.IssueComment): The list of Github issue comment objects.
-
-        Returns:
-            list: A list of Github issue participants.
-        """
-
-        # Define the regex pattern to search for GitHub usernames (e.g., @username)
-        pattern = r'@([a-zA-Z0-9\-_]+)'
-
-        # Search in the issue body
-        issue_participants = re.findall(pattern, issue.body)
-
-        # Search in each comment body
-        comment_participants = []
-        if comments:
-            for comment in comments:
-                comment_participants.extend(re.findall(pattern, comment.body))
-
-        # Retain a unique list of issue participants
-        participants = list(set(issue_participants + comment_participants))
-
-        # Remove the agent-name
-        if self.agent_name in participants:
-            participants.remove(self.agent_name)
-
-        return participants
-
-    def _get_issue_team_members(
+    def _walk_comments(
         self,
-        issue: Issue.Issue,
-        comments: list[IssueComment.IssueComment]
-    ) -> tuple[str, str, list[str], list[str]]:
-        """Retrieves the author of the Github issue
+        issue: github.IssueView,
+        comments: list[github.CommentView]
+    ) -> tuple[TeamMembers, str]:
+        """Retrieves the team members of the Github issue and formats the issue comments for the
+        LLM prompt in a single pass over the comments.
 
         Args:
-            issue (github.Issue.Issue): The Github issue object.
-            comments (github.IssueComment.IssueComment): The list of Github issue comment objects.
+            issue (github.IssueView): The Github issue view.
+            comments (list[github.CommentView]): The list of Github issue comment views, from oldest to newest.
 
         Returns:
-            tuple: A tuple of user names, ({primary}, {author}, {commenters}, {participants})
+            tuple: A tuple containing the team members, ({primary}, {author}, {commenters}, {participants}),
+                and the formatted issue comments.
         """
 
         # Retrieve the issue author
-        author = self._get_issue_author(issue=issue)
+        author = issue.author
 
-        # Retrieve the list of issue commenters
-        commenters = self._get_issue_commenters(comments=comments)
+        # Retrieve the participants mentioned in the issue body
+        participants = set(USERNAME_PATTERN.findall(issue.body))
 
-        # Retrieve the list of issue participants
-        participants = self._get_issue_participants(issue=issue, comments=comments)
+        # Retrieve, in a single pass over the comments,
+        #   the unique commenters, in the order they first commented
+        #   the participants mentioned in each comment
+        #   the most recent commenter who mentioned the agent
+        #   the formatted comment for the LLM prompt
 
-        # Retrieve the most recent commenter who mentioned the agent
-        primary = self._get_issue_latest_commenter(comments=comments)
-
-        # Remove the issue-athor and primary commenter from the commenters
+        commenters = {}
+        primary = None
+        fragments = []
+        for comment in comments:
+            fragments.append(f"[{comment.created_at:%Y-%m-%d %H:%M:%S}] **{comment.author}** said: {comment.body}")
+            if comment.author != self.agent_name:  # Do not include the agent-name
+                commenters.setdefault(comment.author)
+            participants.update(USERNAME_PATTERN.findall(comment.body))
+            if self.mention in comment.body:
+                primary = comment.author
+
+        # Remove the agent-name, issue-author and primary commenter from the commenters
         #   and participants to avoid duplicate mentions
 
-        for participant in list(set([author, primary])):
-            if participant:
-                if participant in commenters:
-                    commenters.remove(participant)
-                if participant in participants:
-                    participants.remove(participant)
-
-        return (
-            primary if primary else author,
-            author,
-            commenters,
-            participants,
-        )
-
-    def _has_agent_commented(self, comments: list[IssueComment.IssueComment]):
-        """Checks if the agent has already commented on the issue.
+        skip = {member for member in (self.agent_name, author, primary) if member}
+        commenters = [commenter for commenter in commenters if commenter not in skip]
+        participants -= skip
 
-        Args:
-            comments (list): A list of comment objects.
+        team_members = TeamMembers(
+            primary=primary or author,
+            author=author,
+            commenters=commenters,
+            participants=participants,
+        )
 
-        Returns:
-            bool: True if the agent has commented, False otherwise.
-        """
-        return any(comment.user.login == self.agent_name for comment in comments)
+        return team_members, "\n\n".join(fragments)
 
     def _agent_should_respond(
         self,
-        issue: Issue.Issue,
-        comments: list[IssueComment.IssueComment]
-    ) -> tuple[str, str, list[str], list[str]]:
+        issue: github.IssueView,
+        comments: list[github.CommentView]
+    ) -> bool:
         """Determines whether the Bunsen issue-agent should respond.
 
         Args:
-            issue (github.Issue.Issue): The Github issue object.
-            comments (github.IssueComment.IssueComment): The list of Github issue comment objects.
+            issue (github.IssueView): The Github issue view.
+            comments (list[github.CommentView]): The list of Github issue comment views.
 
         Returns:
             bool: True if the Bunsen issue-agent should respond, false otherwise.
         """
 
-        # Define the regex pattern to search for the agent-name
-        pattern = rf'@{re.escape(self.agent_name)}'
-
         # Respond if the Bunsen issue-agent is mentioned in the issue body and there are
         #   no comments yet
 
         if not comments:
-            if re.search(pattern, issue.body):
+            if self.mention in issue.body:
                 return True
 
         # Respond if there are issue comments and the Bunsen issue-agent is mentioned in the latest
-        #   comment
+        #   comment, where comments are returned by GitHub from oldest to newest
 
         else:
-            most_recent_comment = max(comments, key=lambda c: c.created_at)
-            if re.search(pattern, most_recent_comment.body):
+            if self.mention in comments[-1].body:
                 return True
 
         return False
@@ -250,19 +177,27 @@ class Bunsen:
         Returns:
             str: The generated response from the LLM, or None if an error occurs.
         """
+        messages = [{"role": role, "content": prompt}]
+        key = LLM_RESPONSES.key(model=self.llm_model, messages=messages)
+        content = LLM_RESPONSES.get(key)
+        if content is not None:
+            logger.info("Using the cached LLM response.")
+            return content
+
         try:
-            response = llms.chat(
-                model=self.llm_model,
-                messages=[{"role": role, "content": prompt}]
-            )
+            response = llms.chat(model=self.llm_model, messages=messages)
 
             # Return the message content from the llm response
             #   The llm response is always in the openai format
 
-            return response.choices[0].message.content
+            content = response.choices[0].message.content
+            if content is not None:
+                LLM_RESPONSES.set(key, content)
+
+            return content
 
         except Exception as e:
-            print(f"Error generating LLM response: {e}")
+            logger.error("Error generating LLM response: %s", e)
             return None
 
     def comment(self, repo_name: str, issue_id: int):
@@ -272,14 +207,14 @@ class Bunsen:
             repo_name (str): The full name of the repository (e.g., 'owner/repository').
             issue_id (int): The ID of the GitHub issue to process.
         """
-        print(
-            f"Processing issue #{issue_id} in repository '{repo_name}' with the Bunsen issue-agent..."
+        logger.info(
+            "Processing issue #%s in repository '%s' with the Bunsen issue-agent...", issue_id, repo_name
         )
 
         issue, comments = self._get_issue_data(repo_name, issue_id)
 
         if not issue:
-            print(f"Issue #{issue_id} does not exist in repository '{repo_name}'.")
+            logger.info("Issue #%s does not exist in repository '%s'.", issue_id, repo_name)
             return
 
         # Determine whether the Bunsen issue-agent has been requested
@@ -291,22 +226,19 @@ class Bunsen:
         #   Otherwise, skip the request.
 
         if not self._agent_should_respond(issue=issue, comments=comments):
-            print("The Bunsen issue-agent was not mentioned in the issue and will not respond.")
+            logger.info("The Bunsen issue-agent was not mentioned in the issue and will not respond.")
             return
 
         # Build the prompt for the LLM
-        issue_body = issue.body if issue.body else "No description provided."
-        issue_comments = "\n\n".join(
-            f"[{comment.created_at.strftime('%Y-%m-%d %H:%M:%S')}] **{comment.user.login}** said: {comment.body}"
-            for comment in comments
-        )
+        issue_body = issue.body or "No description provided."
+        team_members, issue_comments = self._walk_comments(issue=issue, comments=comments)
         prompt = prompts.get_issue_response_prompt(
             agent_name=self.agent_name,
             issue_title=issue.title,
             issue_body=issue_body,
             issue_comments=issue_comments,
         )
-        print(f"The Bunsen issue-agent prompt is: {prompt}")
+        logger.info("The Bunsen issue-agent prompt is: %s", prompt)
 
         # Get the LLM's response
         llm_response = self._get_llm_response(
@@ -316,17 +248,11 @@ class Bunsen:
 
         if llm_response:
 
-            # Get the issue participants
-            primary, _, _, participants = self._get_issue_team_members(
-                issue=issue,
-                comments=comments,
-            )
-
             # Construct the comment, cc'ing the issue-participants
-            comment_body = f"@{primary}\n\n{llm_response}"
+            comment_body = f"@{team_members.primary}\n\n{llm_response}"
 
-            if participants:
-                comment_body = + f"\n\ncc {', '.join([f'@{p}' for p in participants])}"
+            if team_members.participants:
+                comment_body += f"\n\ncc {', '.join([f'@{p}' for p in sorted(team_members.participants)])}"
 
             # Post the response as a comment on the issue
             self.github_client.post_comment(
@@ -334,7 +260,7 @@ class Bunsen:
                 issue_id=issue_id,
                 comment_body=comment_body
             )
-            print(f"The Bunsen issue-agent response is: {llm_response}.")
+            logger.info("The Bunsen issue-agent response is: %s.", llm_response)
 
     def dispatch_coding_agent(self, repo_name: str, issue_id: int):
         """Dispatches the coding agent workflow for the issue.
@@ -9,23 +9,14 @@ SWE_AGENT_SYSTEM_TEMPLATE = settings.SWE_AGENT.get("agent", {}).get("templates",
 SWE_AGENT_ROLE = "assistant"
 
 
-def get_issue_response_prompt(
-    agent_name: str, issue_title: str, issue_body: str, issue_comments: str
-) -> str:
-    """Generates a prompt for the LLM to create a helpful and concise response
-    to a GitHub issue.
-
-    Args:
-        agent_name (str): The name of the AI agent (e.g., "Dr. Bunsen Honeydew").
-        issue_title (str): The title of the GitHub issue.
-        issue_body (str): The main body content of the GitHub issue.
-        issue_comments (str): The conversation history from the issue comments.
+# The issue response prompt template
+#   The system template is filled in once, escaping any braces so that `str.format`
+#   only substitutes the issue fields
 
-    Returns:
-        str: The full prompt string to send to the LLM.
-    """
-    return f"""
-    {ISSUE_AGENT_SYSTEM_TEMPLATE}
+ISSUE_RESPONSE_TEMPLATE = (
+    "\n    "
+    + ISSUE_AGENT_SYSTEM_TEMPLATE.replace("{", "{{").replace("}", "}}")
+    + """
 
     Based on the following GitHub issue and its comments, provide a concise and
     helpful response as {agent_name}. Your goal is to understand the problem, propose a path
@@ -40,3 +31,27 @@ def get_issue_response_prompt(
     {issue_comments}
     ---
     """
+)
+
+
+def get_issue_response_prompt(
+    agent_name: str, issue_title: str, issue_body: str, issue_comments: str
+) -> str:
+    """Generates a prompt for the LLM to create a helpful and concise response
+    to a GitHub issue.
+
+    Args:
+        agent_name (str): The name of the AI agent (e.g., "Dr. Bunsen Honeydew").
+        issue_title (str): The title of the GitHub issue.
+        issue_body (str): The main body content of the GitHub issue.
+        issue_comments (str): The conversation history from the issue comments.
+
+    Returns:
+        str: The full prompt string to send to the LLM.
+    """
+    return ISSUE_RESPONSE_TEMPLATE.format(
+        agent_name=agent_name,
+        issue_title=issue_title,
+        issue_body=issue_body,
+        issue_comments=issue_comments,
+    )
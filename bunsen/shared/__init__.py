@@ -1,5 +1,14 @@
 """Shared utilities"""
 
-from bunsen.shared import github, llms, settings, yaml_utils
+import importlib
 
-__all__ = ["github", "llms", "settings", "yaml_utils"]
+__all__ = ["github", "llm_cache", "llms", "settings", "yaml_utils"]
+
+
+def __getattr__(name: str):
+    """Imports the shared submodules on first access, so that importing `settings`
+    does not also load the GitHub and LLM client libraries.
+    """
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,79 @@
 """Github client"""
 
+from datetime import datetime
+import functools
 from github import Github, Auth, GithubException, Repository, Issue, IssueComment
+from github.GithubObject import CompletableGithubObject
+import logging
+import threading
+from typing import Callable, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# The maximum number of items per page supported by the GitHub API
+MAX_PAGE_SIZE = 100
+
+# The maximum number of issues and file contents cached for conditional requests
+CONDITIONAL_CACHE_SIZE = 256
+
+# The GraphQL query to retrieve an issue, or pull request, and a page of its comments
+#   Webhook comment events are also sent for pull request conversations
+
+ISSUE_WITH_COMMENTS_QUERY = """
+query($owner: String!, $name: String!, $number: Int!, $pageSize: Int!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    issueOrPullRequest(number: $number) {
+      ... on Issue {
+        title
+        body
+        author { login }
+        comments(first: $pageSize, after: $cursor) {
+          pageInfo { hasNextPage endCursor }
+          nodes { body createdAt author { login } }
+        }
+      }
+      ... on PullRequest {
+        title
+        body
+        author { login }
+        comments(first: $pageSize, after: $cursor) {
+          pageInfo { hasNextPage endCursor }
+          nodes { body createdAt author { login } }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+class CommentView(NamedTuple):
+    """A read-only view of a GitHub issue comment."""
+
+    author: str
+    body: str
+    created_at: datetime
+
+
+class IssueView(NamedTuple):
+    """A read-only view of a GitHub issue and its comments, in chronological order."""
+
+    title: str
+    body: str  # Empty if the issue has no description
+    author: str
+    comments: list[CommentView]
+
+
+def _get_login(node: dict) -> str:
+    """Retrieves the login of the author of a GraphQL node.
+
+    Args:
+        node (dict): The GraphQL issue or comment node.
+
+    Returns:
+        str: The login of the author, or 'ghost' if the account was deleted.
+    """
+    return (node.get("author") or {}).get("login", "ghost")
 
 
 class Client:
@@ -27,7 +100,10 @@ class Client:
 
             # Authenticate
             self.identity = Github(auth=app_auth)  # Authenticate as the app for the identity
-            self.g = Github(auth=app_installation_auth)  # Authenticate as the app installation for requests
+            self.g = Github(  # Authenticate as the app installation for requests
+                auth=app_installation_auth,
+                per_page=MAX_PAGE_SIZE,  # Request the maximum page size to minimize paginated requests
+            )
 
             # Retain the authenticated requester
             self.requests = self.g.requester
@@ -36,17 +112,34 @@ class Client:
             self.installation_id = installation_id
             self.token = app_installation_auth.token
 
-            # Retain the Github App name
-            self.user = self.identity.get_app().name
+            # Cache the repository objects by name
+            #   The repositories of an installation are few, so the cache is unbounded
+
+            self._repos: dict[str, Repository.Repository] = {}
+
+            # Cache the issues and file contents by request, to revalidate them
+            #   with conditional requests
+
+            self._conditional: dict[tuple, CompletableGithubObject] = {}
+            self._conditional_lock = threading.Lock()
 
-            print(f"Successfully authenticated as `{self.user}`.")
+            logger.info("Successfully authenticated as installation `%s`.", installation_id)
 
         except Exception as e:
-            print(f"Error authenticating to GitHub: {e}")
+            logger.error("Error authenticating to GitHub: %s", e)
             raise
 
+    @functools.cached_property
+    def user(self) -> str:
+        """The name of the GitHub App, retrieved once on first access.
+
+        Returns:
+            str: The name of the GitHub App.
+        """
+        return self.identity.get_app().name
+
     def get_repo(self, repo_name: str) -> Repository.Repository | None:
-        """Retrieves a GitHub repository object.
+        """Retrieves a GitHub repository object, requesting it only once per repository.
 
         Args:
             repo_name (str): The full name of the repository (e.g., 'octocat/hello-world').
@@ -54,12 +147,53 @@ class Client:
         Returns:
             github.Repository.Repository: The repository object.
         """
-        try:
-            repo = self.g.get_repo(repo_name)
-            return repo
-        except GithubException as e:
-            print(f"Error getting repository '{repo_name}': {e}")
-            return None
+        repo = self._repos.get(repo_name)
+        if repo is None:
+            try:
+                repo = self.g.get_repo(repo_name)
+            except GithubException as e:
+                logger.error("Error getting repository '%s': %s", repo_name, e)
+                return None
+            self._repos[repo_name] = repo
+        return repo
+
+    def _get_conditional(self, key: tuple, fetch: Callable[[], CompletableGithubObject]) -> CompletableGithubObject:
+        """Retrieves a GitHub object, revalidating a cached copy with its `ETag`.
+
+        GitHub responds `304 Not Modified` to an unchanged object, which skips the body
+        transfer and does not count against the rate limit.
+
+        Args:
+            key (tuple): The cache key of the request.
+            fetch (Callable): Retrieves the object when it is not cached.
+
+        Returns:
+            github.GithubObject.CompletableGithubObject: The current object.
+        """
+
+        # The client is shared by the agent actions running in the threadpool, so the cache is
+        #   only read and updated under the lock, and the request is sent outside of it
+        #   A popped object is owned by this thread, so it is never updated concurrently
+
+        with self._conditional_lock:
+            obj = self._conditional.pop(key, None)
+
+        if obj is None:
+            obj = fetch()
+        else:
+            obj.update()  # Sends `If-None-Match`, keeping the cached attributes on a 304
+
+        # Evict the least-recently used object
+        #   Another thread may have cached the same request in the meantime
+
+        with self._conditional_lock:
+            self._conditional.pop(key, None)
+            if len(self._conditional) >= CONDITIONAL_CACHE_SIZE:
+                self._conditional.pop(next(iter(self._conditional)))
+
+            self._conditional[key] = obj
+
+        return obj
 
     def get_issue(self, repo_name: str, issue_id: int) -> Issue.Issue | None:
         """Retrieves a specific GitHub issue from a repository.
@@ -74,13 +208,64 @@ class Client:
         repo = self.get_repo(repo_name)
         if repo:
             try:
-                issue = repo.get_issue(number=issue_id)
+                issue = self._get_conditional(
+                    key=("issue", repo_name, issue_id),
+                    fetch=lambda: repo.get_issue(number=issue_id),
+                )
                 return issue
             except GithubException as e:
-                print(f"Error getting issue #{issue_id} from '{repo_name}': {e}")
+                logger.error("Error getting issue #%s from '%s': %s", issue_id, repo_name, e)
                 return None
         return None
 
+    def get_issue_with_comments(self, repo_name: str, issue_id: int) -> IssueView | None:
+        """Retrieves a GitHub issue, or pull request, and all of its comments using the GraphQL API,
+        requesting the issue together with up to 100 comments at a time.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'octocat/hello-world').
+            issue_id (int): The id of the issue to retrieve.
+
+        Returns:
+            IssueView: The issue and its comments, or None if the issue is not found.
+        """
+        owner, _, name = repo_name.partition("/")
+        variables = {"owner": owner, "name": name, "number": issue_id, "pageSize": MAX_PAGE_SIZE, "cursor": None}
+        comments = []
+
+        try:
+            while True:
+                _, data = self.requests.graphql_query(query=ISSUE_WITH_COMMENTS_QUERY, variables=variables)
+                issue = ((data.get("data") or {}).get("repository") or {}).get("issueOrPullRequest")
+                if not issue:
+                    logger.error("Error getting issue #%s from '%s': Not found", issue_id, repo_name)
+                    return None
+
+                comments.extend(
+                    CommentView(
+                        author=_get_login(node),
+                        body=node["body"],
+                        created_at=datetime.fromisoformat(node["createdAt"]),
+                    )
+                    for node in issue["comments"]["nodes"]
+                )
+
+                page_info = issue["comments"]["pageInfo"]
+                if not page_info["hasNextPage"]:
+                    break
+                variables["cursor"] = page_info["endCursor"]
+
+        except GithubException as e:
+            logger.error("Error getting issue #%s from '%s': %s", issue_id, repo_name, e)
+            return None
+
+        return IssueView(
+            title=issue["title"],
+            body=issue["body"] or "",
+            author=_get_login(issue),
+            comments=comments,
+        )
+
     def get_issue_comments(self, repo_name: str, issue_id: int) -> list[IssueComment.IssueComment]:
         """Retrieves all comments for a specific GitHub issue.
 
@@ -96,7 +281,7 @@ class Client:
             try:
                 return list(issue.get_comments())
             except GithubException as e:
-                print(f"Error getting comments for issue #{issue_id}: {e}")
+                logger.error("Error getting comments for issue #%s: %s", issue_id, e)
                 return []
         return []
 
@@ -112,9 +297,9 @@ class Client:
         if issue:
             try:
                 issue.create_comment(comment_body)
-                print(f"Successfully added comment to issue #{issue.number}")
+                logger.info("Successfully added comment to issue #%s", issue.number)
             except GithubException as e:
-                print(f"Error adding comment to issue #{issue.number}: {e}")
+                logger.error("Error adding comment to issue #%s: %s", issue.number, e)
 
     def add_label_to_issue(self, repo_name: str, issue_id: int, label_name: str):
         """Adds a label to a GitHub issue. This is a key way to communicate status and trigger workflows,
@@ -127,10 +312,17 @@ class Client:
         """
         issue = self.get_issue(repo_name, issue_id)
         if issue:
+
+            # Skip the request if the issue is already labeled
+            #   The issue is revalidated by `get_issue`, so its labels are current
+
+            if any(label.name == label_name for label in issue.labels):
+                return
+
             try:
                 issue.add_to_labels(label_name)
             except GithubException as e:
-                print(f"Error adding label to issue #{issue_id}: {e}")
+                logger.error("Error adding label to issue #%s: %s", issue_id, e)
 
     def run_workflow_dispatch(self, repo_name: str, workflow_filename: str, issue_id: int, branch: str = "main"):
         """Triggers a GitHub Actions workflow using the 'workflow_dispatch' event
@@ -162,12 +354,15 @@ class Client:
                 input=data
             )
 
-            print(f"Successfully triggered workflow '{workflow_filename}' for issue #{issue_id} in repository `{repo_name}`")
+            logger.info(
+                "Successfully triggered workflow '%s' for issue #%s in repository `%s`",
+                workflow_filename, issue_id, repo_name
+            )
 
         except Exception as e:
-            print(
-                f"An error occurred while triggering workflow '{workflow_filename}'"
-                f" for issue #{issue_id} in repository `{repo_name}`: {e}"
+            logger.error(
+                "An error occurred while triggering workflow '%s' for issue #%s in repository `%s`: %s",
+                workflow_filename, issue_id, repo_name, e
             )
 
     def get_repository_content(
@@ -186,11 +381,54 @@ class Client:
         repo = self.get_repo(repo_name)
         if repo:
             try:
-                contents = repo.get_contents(path, ref=branch)
+                contents = self._get_conditional(
+                    key=("contents", repo_name, path, branch),
+                    fetch=lambda: repo.get_contents(path, ref=branch),
+                )
                 return contents.decoded_content.decode("utf-8")
             except GithubException as e:
-                print(
-                    f"Error getting content for path '{path}' on branch '{branch}': {e}"
+                logger.error(
+                    "Error getting content for path '%s' on branch '%s': %s", path, branch, e
                 )
                 return None
         return None
+
+    def get_repository_contents(
+        self, repo_name: str, paths: list[str], branch: str = "main"
+    ) -> dict[str, str | None]:
+        """Retrieves the content of several files from a repository in a single GraphQL request.
+
+        Args:
+            repo_name (str): The full name of the repository.
+            paths (list[str]): The paths to the files within the repository (e.g., ['README.md']).
+            branch (str): The branch to retrieve the content from. Defaults to 'main'.
+
+        Returns:
+            dict[str, str | None]: The content of each file as a string, or None if the file is
+                not found or is binary.
+        """
+        if not paths:
+            return {}
+
+        # Alias one `object` field per file, passing each `<branch>:<path>` expression as a variable
+        owner, _, name = repo_name.partition("/")
+        variables = {"owner": owner, "name": name}
+        for i, path in enumerate(paths):
+            variables[f"e{i}"] = f"{branch}:{path}"
+
+        query = "query($owner: String!, $name: String!, {}) {{ repository(owner: $owner, name: $name) {{ {} }} }}".format(
+            ", ".join(f"$e{i}: String!" for i in range(len(paths))),
+            " ".join(f"f{i}: object(expression: $e{i}) {{ ... on Blob {{ text }} }}" for i in range(len(paths))),
+        )
+
+        try:
+            _, data = self.requests.graphql_query(query=query, variables=variables)
+        except GithubException as e:
+            logger.error("Error getting contents on branch '%s' from '%s': %s", branch, repo_name, e)
+            return {path: None for path in paths}
+
+        repository = (data.get("data") or {}).get("repository") or {}
+        return {
+            path: (repository.get(f"f{i}") or {}).get("text")
+            for i, path in enumerate(paths)
+        }
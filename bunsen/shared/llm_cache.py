@@ -0,0 +1,73 @@
+"""LLM response cache"""
+
+import hashlib
+import json
+import threading
+import time
+
+
+class ResponseCache:
+    """A `class` object that represents an in-process, exact-match cache of LLM responses."""
+
+    def __init__(self, ttl: float = 3600, max_size: int = 256):
+        """Initializes the LLM response cache.
+
+        Args:
+            ttl (float): The number of seconds a response remains cached. Defaults to 1 hour.
+            max_size (int): The maximum number of cached responses. Defaults to 256.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._responses = {}  # {key: (expires_at, content)}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, messages: list[dict]) -> str:
+        """Generates the cache key of a chat/completion request.
+
+        Args:
+            model (str): The model name to use for the request.
+            messages (list[dict]): The list of dicts in OpenAI format [{"role": "user", "content": "..."}, ...]
+
+        Returns:
+            str: The SHA-256 hex-digest of the request.
+        """
+        request = json.dumps({"model": model, "messages": messages}, sort_keys=True)
+        return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Retrieves a cached response.
+
+        Args:
+            key (str): The cache key of the chat/completion request.
+
+        Returns:
+            str: The cached response, or None if it is not cached or has expired.
+        """
+        with self._lock:
+            entry = self._responses.get(key)
+            if entry is None:
+                return None
+
+            expires_at, content = entry
+            if expires_at <= time.monotonic():
+                del self._responses[key]
+                return None
+
+            return content
+
+    def set(self, key: str, content: str):
+        """Caches a response.
+
+        Args:
+            key (str): The cache key of the chat/completion request.
+            content (str): The response content.
+        """
+        with self._lock:
+            self._responses.pop(key, None)
+
+            # Evict the oldest response
+            if len(self._responses) >= self.max_size:
+                self._responses.pop(next(iter(self._responses)))
+
+            self._responses[key] = (time.monotonic() + self.ttl, content)
@@ -1,15 +1,18 @@
 """Environment and settings"""
 
 import dotenv
+import functools
 from pathlib import Path
 import os
+from types import MappingProxyType
 
 from bunsen.shared import yaml_utils
 
 # Default settings location
-DEFAULT_SETTINGS_PATH = Path(Path.cwd(), ".bunsen", "settings.yaml")
-DEFAULT_ISSUE_AGENT_SETTINGS_PATH = Path(Path.cwd(), ".bunsen", "issue_agent.yaml")
-DEFAULT_SWE_AGENT_SETTINGS_PATH = Path(Path.cwd(), ".bunsen", "swe_agent.yaml")
+DEFAULT_SETTINGS_DIR = Path(Path.cwd(), ".bunsen")
+DEFAULT_SETTINGS_PATH = Path(DEFAULT_SETTINGS_DIR, "settings.yaml")
+DEFAULT_ISSUE_AGENT_SETTINGS_PATH = Path(DEFAULT_SETTINGS_DIR, "issue_agent.yaml")
+DEFAULT_SWE_AGENT_SETTINGS_PATH = Path(DEFAULT_SETTINGS_DIR, "swe_agent.yaml")
 
 # Default model settings
 DEFAULT_ISSUE_AGENT_SETTINGS = {  # This `.yaml` config has limited settings
@@ -100,62 +103,80 @@ DEFAULT_SWE_AGENT_SETTINGS = {  # This `.yaml` config is defined by `swe-agent`
     }
 }
 
-if not DEFAULT_SETTINGS_PATH.exists():
-    raise FileNotFoundError(
-        f"The `settings.yaml` configuration file cannot be found at {DEFAULT_SETTINGS_PATH}."
+
+@functools.lru_cache(maxsize=1)
+def _load_env() -> MappingProxyType:
+    """Loads the `.env` file once and returns a read-only snapshot of the Bunsen environment variables.
+
+    Returns:
+        types.MappingProxyType: A read-only mapping of environment variable names to their values.
+    """
+    dotenv.load_dotenv()
+    _env = os.environ
+    return MappingProxyType(
+        {
+            "BUNSEN_GITHUB_APP_ID": _env.get("BUNSEN_GITHUB_APP_ID"),
+            "BUNSEN_GITHUB_PRIVATE_KEY": _env.get("BUNSEN_GITHUB_PRIVATE_KEY"),
+            "BUNSEN_GITHUB_WEBHOOK_SECRET": _env.get("BUNSEN_GITHUB_WEBHOOK_SECRET"),
+        }
     )
 
+
 # Load environment
-dotenv.load_dotenv()
+ENV = _load_env()
 
 # Load settings
-SETTINGS = yaml_utils.load_yaml_file(DEFAULT_SETTINGS_PATH)
+SETTINGS = yaml_utils.load_yaml_file(DEFAULT_SETTINGS_PATH, strict=True)
 
 # Load model settings
-if DEFAULT_ISSUE_AGENT_SETTINGS_PATH.exists():
-    ISSUE_AGENT = yaml_utils.load_yaml_file(DEFAULT_ISSUE_AGENT_SETTINGS_PATH)
-else:
-    ISSUE_AGENT = DEFAULT_ISSUE_AGENT_SETTINGS.copy()
+try:
+    ISSUE_AGENT = yaml_utils.load_yaml_file(DEFAULT_ISSUE_AGENT_SETTINGS_PATH, strict=True)
+except FileNotFoundError:
+    ISSUE_AGENT = DEFAULT_ISSUE_AGENT_SETTINGS
 
     # Create the `.yaml` configuration when it does not exist
     yaml_utils.dump_yaml_file(DEFAULT_ISSUE_AGENT_SETTINGS_PATH, DEFAULT_ISSUE_AGENT_SETTINGS)
 
-if DEFAULT_SWE_AGENT_SETTINGS_PATH.exists():
-    SWE_AGENT = yaml_utils.load_yaml_file(DEFAULT_SWE_AGENT_SETTINGS_PATH)
-else:
-    SWE_AGENT = DEFAULT_SWE_AGENT_SETTINGS.copy()
+try:
+    SWE_AGENT = yaml_utils.load_yaml_file(DEFAULT_SWE_AGENT_SETTINGS_PATH, strict=True)
+except FileNotFoundError:
+    SWE_AGENT = DEFAULT_SWE_AGENT_SETTINGS
 
     # Create the `.yaml` configuration when it does not exist
     yaml_utils.dump_yaml_file(DEFAULT_SWE_AGENT_SETTINGS_PATH, DEFAULT_SWE_AGENT_SETTINGS)
 
+# Retrieve the settings sections once
+_github = SETTINGS.get("github") or {}
+_llm = SETTINGS.get("llm") or {}
+
 # Constants
-GITHUB_APP_ID = os.getenv("BUNSEN_GITHUB_APP_ID")
-GITHUB_PRIVATE_KEY = os.getenv("BUNSEN_GITHUB_PRIVATE_KEY")
-GITHUB_WEBHOOK_SECRET = os.getenv("BUNSEN_GITHUB_WEBHOOK_SECRET")
-GITHUB_REPO_URL = SETTINGS.get("github", {}).get("repo_url")
-GITHUB_MAIN_BRANCH = SETTINGS.get("github", {}).get("main_branch")
-GITHUB_CODING_TRIGGER_LABEL = SETTINGS.get("github", {}).get("coding_trigger_label")
-GITHUB_CODING_WORKFLOW_FILENAME = SETTINGS.get("github", {}).get("coding_workflow_filename")
-
-BUNSEN_MODEL_NAME = SETTINGS.get("llm", {}).get("bunsen_model_name")
-BEAKER_MODEL_NAME = SETTINGS.get("llm", {}).get("beaker_model_name")
-
-# Construct a dictionary of constants
-_constants = {
-    "env > BUNSEN_GITHUB_APP_ID": GITHUB_APP_ID,
-    "env > BUNSEN_GITHUB_PRIVATE_KEY": GITHUB_PRIVATE_KEY,
-    "env > BUNSEN_GITHUB_WEBHOOK_SECRET": GITHUB_WEBHOOK_SECRET,
-    "settings > github > repo_url": GITHUB_REPO_URL,
-    "settings > github > main_branch": GITHUB_MAIN_BRANCH,
-    "settings > github > coding_trigger_label": GITHUB_CODING_TRIGGER_LABEL,
-    "settings > github > coding_workflow_filename":  GITHUB_CODING_WORKFLOW_FILENAME,
-    "llm > bunsen_model_name": BUNSEN_MODEL_NAME,
-    "llm > beaker_model_name": BEAKER_MODEL_NAME,
-}
+GITHUB_APP_ID = ENV.get("BUNSEN_GITHUB_APP_ID")
+GITHUB_PRIVATE_KEY = ENV.get("BUNSEN_GITHUB_PRIVATE_KEY")
+GITHUB_WEBHOOK_SECRET = ENV.get("BUNSEN_GITHUB_WEBHOOK_SECRET")
+GITHUB_REPO_URL = _github.get("repo_url")
+GITHUB_MAIN_BRANCH = _github.get("main_branch")
+GITHUB_CODING_TRIGGER_LABEL = _github.get("coding_trigger_label")
+GITHUB_CODING_WORKFLOW_FILENAME = _github.get("coding_workflow_filename")
+
+BUNSEN_MODEL_NAME = _llm.get("bunsen_model_name")
+BEAKER_MODEL_NAME = _llm.get("beaker_model_name")
+
+# Construct the (label, value) pairs of the required constants
+_constants = (
+    ("env > BUNSEN_GITHUB_APP_ID", GITHUB_APP_ID),
+    ("env > BUNSEN_GITHUB_PRIVATE_KEY", GITHUB_PRIVATE_KEY),
+    ("env > BUNSEN_GITHUB_WEBHOOK_SECRET", GITHUB_WEBHOOK_SECRET),
+    ("settings > github > repo_url", GITHUB_REPO_URL),
+    ("settings > github > main_branch", GITHUB_MAIN_BRANCH),
+    ("settings > github > coding_trigger_label", GITHUB_CODING_TRIGGER_LABEL),
+    ("settings > github > coding_workflow_filename", GITHUB_CODING_WORKFLOW_FILENAME),
+    ("llm > bunsen_model_name", BUNSEN_MODEL_NAME),
+    ("llm > beaker_model_name", BEAKER_MODEL_NAME),
+)
 
 # Identify missing constants
 missing_constants = [
-    constant for constant in _constants.keys() if not _constants.get(constant)
+    constant for constant, value in _constants if not value
 ]
 
 if missing_constants:
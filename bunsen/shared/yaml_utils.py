@@ -1,26 +1,70 @@
 """YAML utilities"""
 
+import copy
+import functools
+import logging
+import os
 import yaml
 
+logger = logging.getLogger(__name__)
 
-def load_yaml_file(file_path: str) -> dict:
+# Use the libyaml C loader and dumper, when PyYAML is built with libyaml
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+
+@functools.lru_cache(maxsize=8)
+def _load_yaml_file_cached(file_path: str, mtime_ns: int, size: int) -> dict:
+    """Parses a YAML file, memoized by its path, modification time and size.
+
+    Args:
+        file_path (str): The full path to the YAML file.
+        mtime_ns (int): The modification time of the file in nanoseconds, used to invalidate the cache.
+        size (int): The size of the file in bytes, used to invalidate the cache.
+
+    Returns:
+        Dict: A dictionary containing the parsed YAML data.
+    """
+    with open(file_path, "r") as f:
+        return yaml.load(f, Loader=_Loader)
+
+
+def load_yaml_file(file_path: str, strict: bool = False) -> dict:
     """Loads and parses a YAML file from a given path.
 
     Args:
         file_path (str): The full path to the YAML file.
+        strict (bool): Whether to raise an error if the file is not found. Defaults to False.
 
     Returns:
         Dict: A dictionary containing the parsed YAML data.
-              Returns an empty dictionary if the file is not found.
+              Returns an empty dictionary if the file is not found and `strict` is False.
+
+    Raises:
+        FileNotFoundError: If the file is not found and `strict` is True.
     """
     try:
-        with open(file_path, "r") as f:
-            return yaml.safe_load(f)
+        stat = os.stat(file_path)
+
+        # Return a copy so that callers cannot mutate the cached data
+        return copy.deepcopy(
+            _load_yaml_file_cached(os.fspath(file_path), stat.st_mtime_ns, stat.st_size)
+        )
     except FileNotFoundError:
-        print(f"Warning: Configuration file not found at '{file_path}'.")
+        if strict:
+            raise FileNotFoundError(
+                f"The `{os.path.basename(file_path)}` configuration file cannot be found at {file_path}."
+            ) from None
+        logger.warning("Configuration file not found at '%s'.", file_path)
         return {}
 
 
+# Expose the cache, e.g. to re-read files modified within the file-system's timestamp resolution
+load_yaml_file.cache_clear = _load_yaml_file_cached.cache_clear
+
+
 def dump_yaml_file(file_path: str, data: dict):
     """Saves a dictionary to a YAML file at a given path.
 
@@ -30,6 +74,6 @@ def dump_yaml_file(file_path: str, data: dict):
     """
     try:
         with open(file_path, "w") as f:
-            yaml.safe_dump(data, f, indent=2)
+            yaml.dump(data, f, Dumper=_Dumper, indent=2)
     except Exception as e:
-        print(f"Error writing to file '{file_path}': {e}")
+        logger.error("Error writing to file '%s': %s", file_path, e)
@@ -1,10 +1,23 @@
 """Beaker swe-agent service"""
 
 import argparse
+import logging
 import sys
 
-from bunsen.shared import settings
-from bunsen.swe_agent import core
+logger = logging.getLogger(__name__)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Builds the command-line argument parser for the Beaker swe-agent.
+
+    Returns:
+        argparse.ArgumentParser: The command-line argument parser.
+    """
+    parser = argparse.ArgumentParser(description="Dispatch the Beaker swe-agent.")
+    parser.add_argument("--repo_name", type=str, help="The GitHub repository name in the format `{owner}/{repo}`.")
+    parser.add_argument("--installation_id", type=int, help="The GitHub App installation ID to use for authentication.")
+    parser.add_argument("--issue_id", type=int, help="The GitHub issue ID to implement, test, and commit.")
+    return parser
 
 
 def main():
@@ -14,11 +27,13 @@ def main():
     """
 
     # Parse command-line arguments
-    parser = argparse.ArgumentParser(description="Dispatch the Beaker swe-agent.")
-    parser.add_argument("--repo_name", type=str, help="The GitHub repository name in the format `{owner}/{repo}`.")
-    parser.add_argument("--installation_id", type=int, help="The GitHub App installation ID to use for authentication.")
-    parser.add_argument("--issue_id", type=int, help="The GitHub issue ID to implement, test, and commit.")
-    args = parser.parse_args()
+    #   `--help` and usage errors exit here, before the settings and runner are imported
+
+    args = _build_parser().parse_args()
+
+    # Import the settings and runner only once the arguments are valid
+    from bunsen.shared import settings
+    from bunsen.swe_agent import core
 
     try:
 
@@ -38,13 +53,19 @@ def main():
         )
 
     except ValueError as e:
-        print(f"Initialization failed: {e}")
+        logger.error("Initialization failed: %s", e)
         sys.exit(1)
 
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        logger.error("An unexpected error occurred: %s", e)
         sys.exit(1)
 
 
 if __name__ == "__main__":
+
+    # Configure logging
+    #   Log to stdout, in order with the streamed swe-agent output and the workflow outputs
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+
     sys.exit(main())
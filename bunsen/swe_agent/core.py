@@ -1,17 +1,65 @@
 """Beaker swe-agent runner"""
 
+from collections import deque
+import functools
 from github import GithubException
-import inspect
-import json
+import logging
+import orjson
 import os
 from pathlib import Path
-import re
+import shlex
 import subprocess
-from textwrap import dedent
+import tempfile
 import traceback
 
 from bunsen.shared import github, settings
 
+logger = logging.getLogger(__name__)
+
+# The number of trailing lines of swe-agent output retained for error reporting
+OUTPUT_TAIL_LINES = 500
+
+# The maximum number of trailing characters of swe-agent output reported in an issue comment
+#   GitHub rejects comments longer than 65,536 characters
+
+OUTPUT_TAIL_CHARS = 60_000
+
+# The fixed prefix of the swe-agent command
+SWE_AGENT_COMMAND = ("sweagent", "run", "--config", os.fspath(settings.DEFAULT_SWE_AGENT_SETTINGS_PATH))
+
+# The (exception type, log description, issue comment) of the anticipated swe-agent errors
+ERROR_COMMENTS = (
+    (
+        RuntimeError,
+        "swe-agent CLI error",
+        "beaker-swe-agent encountered an `swe-agent` CLI error while trying to resolve the issue.",
+    ),
+    (
+        GithubException,
+        "GitHub API error",
+        "beaker-swe-agent encountered a GitHub API error while trying to resolve the issue.",
+    ),
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_client(app_id: str, private_key: str, installation_id: int) -> github.Client:
+    """Returns the GitHub client of an installation, creating it only once per process.
+
+    Args:
+        app_id (str): The ID of the GitHub App.
+        private_key (str): The private key for the GitHub App.
+        installation_id (int): The ID of the specific installation to act on behalf of.
+
+    Returns:
+        github.Client: The GitHub client.
+    """
+    return github.Client(
+        app_id=app_id,
+        private_key=private_key,
+        installation_id=installation_id,
+    )
+
 
 class Beaker:
     """Orchestrates the Beaker swe-agent workflow, acting as an entry point for
@@ -28,36 +76,41 @@ class Beaker:
         """
 
         # Initialize the GitHub client with GitHub App credentials
-        self.github_client = github.Client(
+        self.github_client = _get_client(
             app_id=app_id,
             private_key=private_key,
             installation_id=installation_id,
         )
 
-    def _parse_trajectory_location(self, stdout) -> str:
-        """Parses the trajectory file location from swe-agent.
+    def _run(self, cmd: list[str]) -> tuple[int, str]:
+        """Runs the swe-agent CLI, streaming its output to the console as it is produced.
+
+        Only the trailing lines of the output are retained in memory.
 
         Args:
-            stdout (str): The standard-output from the swe-agent.
+            cmd (list[str]): The swe-agent command to run.
 
         Returns:
-            str: The trajectory file output location.
+            tuple: A tuple containing the exit-code and the trailing output of the swe-agent.
         """
+        output = deque(maxlen=OUTPUT_TAIL_LINES)
+
+        process = subprocess.Popen(  # The subprocess inherits the current working directory
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="ignore",
+            bufsize=1,
+        )
 
-        # Remove indentation
-        stdout = dedent(stdout)
-
-        # Define a regex pattern to match the trajectory file path
-        pattern = re.compile(r'Trajectory will be saved to([\s\S]*?\.traj)', re.DOTALL)
-
-        # Search for the pattern in the output
-        match = pattern.search(stdout)
+        logger.info("swe-agent output:")
+        for line in process.stdout:
+            print(line, end="", flush=True)  # Flush, as stdout is a pipe in GitHub Actions
+            output.append(line)
 
-        if match:
-            trajectory_path = re.sub(r'\s+', '', match.group(1))
-            return str(trajectory_path).strip()
-        else:
-            return None
+        return process.wait(), "".join(output)
 
     def dispatch(self, repo_name: str, repo_url: str, issue_id: int, model_name: str):
         """The main entry point for the Beaker swe-agent.
@@ -73,147 +126,118 @@ class Beaker:
             issue_id (int): The number of the GitHub issue to work on.
             model_name (str): The name of the LLM model.
         """
-        print(f"beaker-swe-agent started working on issue #{issue_id} in repository '{repo_name}'.")
+        logger.info("beaker-swe-agent started working on issue #%s in repository '%s'.", issue_id, repo_name)
 
         try:
 
+            # Fail fast, before launching the swe-agent, if its configuration is missing
+            if not settings.DEFAULT_SWE_AGENT_SETTINGS_PATH.is_file():
+                raise FileNotFoundError(
+                    "The `swe_agent.yaml` configuration file cannot be found at"
+                    f" {settings.DEFAULT_SWE_AGENT_SETTINGS_PATH}."
+                )
+
+            # Save the swe-agent output to a known directory, rather than parsing its location
+            #   from the swe-agent output
+
+            output_dir = tempfile.mkdtemp(prefix="beaker-swe-agent-")
+
             # Construct the command to run the Beaker swe-agent
             cmd = [
-                "sweagent",
-                "run",
-                "--config",
-                settings.DEFAULT_SWE_AGENT_SETTINGS_PATH,
+                *SWE_AGENT_COMMAND,
                 "--agent.model.name",
                 model_name,
                 "--env.repo.github_url",
                 repo_url,
                 "--problem_statement.github_url",
-                f"{repo_url}/issues/{str(issue_id)}",
+                f"{repo_url}/issues/{issue_id}",
+                "--output_dir",
+                output_dir,
             ]
 
-            # Copy the environment variables containing the
-            #   credentials for the LLM provider
-
-            env = os.environ.copy()
-
             # Run the beaker swe-agent
-            result = subprocess.run(
-                cmd,
-                cwd=os.getcwd(),  # The subprocess will run from the current working directory
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="ignore",
-                env=env
-            )
-
-            print("swe-agent stdout:")
-            print(result.stdout)
-
-            # if result.stdout:
-            #     with open(Path.cwd() / "stdout.txt", 'w', encoding="utf-8") as f:
-            #         f.write(result.stdout)
-
-            print("swe-agent stderr:")
-            print(result.stderr)
+            #   The subprocess inherits the environment variables containing the
+            #   credentials for the LLM provider
 
-            # if result.stderr:
-            #     with open(Path.cwd() / "stderr.txt", 'w', encoding="utf-8") as f:
-            #         f.write(result.stderr)
+            returncode, output = self._run(cmd=cmd)
 
             # Handle run-time errors
-            if result.returncode != 0:
+            if returncode != 0:
                 raise RuntimeError(
-                    f"- Command : `{' '.join(cmd)}`\n"
-                    f"- Exit-code : {result.returncode}\n"
+                    f"- Command : `{shlex.join(cmd)}`\n"
+                    f"- Exit-code : {returncode}\n"
                     "- Error-output : \n\n"
                     "```\n"
-                    f"{result.stderr.strip()}\n"
+                    f"{output.strip()[-OUTPUT_TAIL_CHARS:]}\n"
                     "```\n"
                 )
 
-            # Retrieve the trajectory file
-            trajectory_path = self._parse_trajectory_location(stdout=result.stdout)
-
             # Load the trajectory file
-            if Path(trajectory_path).exists():
-                with open(trajectory_path, "r") as f:
-                    trajectory = json.load(f)
-
-                # Retrieve the status
-                status = trajectory.get("info", {}).get("exit_status", False)
-                patch = trajectory.get("info", {}).get("submission", False)
-                stats = trajectory.get("info", {}).get("model_stats")
-
-                # Retrieve the patch
-                patch_path = str(Path(trajectory_path).with_suffix('.patch'))
-
-                self.github_client.post_comment(
-                    repo_name=repo_name,
-                    issue_id=issue_id,
-                    comment_body=(
-                        "beaker-swe-agent finished working on the issue.\n\n"
-                        f"- Status : `{status}`\n"
-                        "- Stats : \n\n"
-                        "```\n"
-                        f"{json.dumps(stats, indent=4)}\n"
-                        "```\n"
-                        f"- Patch : `{patch_path}`\n\n"
-                        "**Patch (diff)**\n\n"
-                        "```\n"
-                        f"{patch}\n"
-                        "```\n"
-                    )
-                )
+            #   The swe-agent saves the trajectory within a sub-directory named by the instance ID
 
-                # Set output
-                print(f"::set-output name=patch_path::{patch_path}")
-                print(f"::set-output name=exit_status::{status}")
-
-            else:
+            trajectory_path = next(Path(output_dir).rglob("*.traj"), None)
+            if trajectory_path is None:
                 raise FileNotFoundError(
                     f"beaker-swe-agent finished working on issue #{issue_id}"
                     f" in repository '{repo_name}' but there is no trajectory file available."
                 )
 
-            print(f"beaker-swe-agent finished working on issue #{issue_id} in repository '{repo_name}'.")
+            trajectory = orjson.loads(trajectory_path.read_bytes())
+
+            # Retrieve the status
+            status = trajectory.get("info", {}).get("exit_status", False)
+            patch = trajectory.get("info", {}).get("submission", False)
+            stats = trajectory.get("info", {}).get("model_stats")
+            stats_output = orjson.dumps(stats, option=orjson.OPT_INDENT_2).decode("utf-8")
+
+            # Retrieve the patch
+            patch_path = str(trajectory_path.with_suffix('.patch'))
 
-        except RuntimeError as e:
-            print(f"swe-agent CLI error: {e}")
-            self.github_client.post_comment(
-                repo_name=repo_name,
-                issue_id=issue_id,
-                comment_body=(
-                    "beaker-swe-agent encountered an `swe-agent` CLI error while trying to resolve the issue."
-                    f"\n\n`{e}`\n"
-                )
-            )
-        except GithubException as e:
-            print(f"GitHub API error: {e}")
             self.github_client.post_comment(
                 repo_name=repo_name,
                 issue_id=issue_id,
                 comment_body=(
-                    "beaker-swe-agent encountered a GitHub API error while trying to resolve the issue."
-                    f"\n\n`{e}`\n"
+                    "beaker-swe-agent finished working on the issue.\n\n"
+                    f"- Status : `{status}`\n"
+                    "- Stats : \n\n"
+                    "```\n"
+                    f"{stats_output}\n"
+                    "```\n"
+                    f"- Patch : `{patch_path}`\n\n"
+                    "**Patch (diff)**\n\n"
+                    "```\n"
+                    f"{patch}\n"
+                    "```\n"
                 )
             )
-        except Exception as e:
 
-            # Retrieve the exception information
-            exception = (
-                f"- Filename : {inspect.trace()[-1][1]}\n"
-                f"- Line Number : Line {inspect.trace()[-1][2]}\n"
-                f"- Function : `{inspect.trace()[-1][3]}()`\n"
-                f"- Exception : `{type(e).__name__}`\n"
-            )
+            # Set output
+            print(f"::set-output name=patch_path::{patch_path}")
+            print(f"::set-output name=exit_status::{status}")
 
-            print(f"An unexpected error occurred:\n\n{type(e).__name__}: {e}")
+            logger.info("beaker-swe-agent finished working on issue #%s in repository '%s'.", issue_id, repo_name)
 
-            self.github_client.post_comment(
-                repo_name=repo_name,
-                issue_id=issue_id,
-                comment_body=(
+        except Exception as e:
+
+            # Describe the anticipated errors, otherwise describe where the unexpected error occurred
+            for exception_type, description, message in ERROR_COMMENTS:
+                if isinstance(e, exception_type):
+                    logger.error("%s: %s", description, e)
+                    comment_body = f"{message}\n\n`{e}`\n"
+                    break
+            else:
+                logger.error("An unexpected error occurred:\n\n%s: %s", type(e).__name__, e)
+
+                # Retrieve the exception information from the frame that raised the exception
+                frame = traceback.extract_tb(e.__traceback__)[-1]
+                exception = (
+                    f"- Filename : {frame.filename}\n"
+                    f"- Line Number : Line {frame.lineno}\n"
+                    f"- Function : `{frame.name}()`\n"
+                    f"- Exception : `{type(e).__name__}`\n"
+                )
+
+                comment_body = (
                     "beaker-swe-agent encountered an unexpected error while trying to resolve the issue.\n\n"
                     f"`{type(e).__name__}: {e}`\n\n"
                     f"{exception}\n\n"
@@ -222,4 +246,9 @@ class Beaker:
                     f"{traceback.format_exc()}\n"
                     "```\n"
                 )
+
+            self.github_client.post_comment(
+                repo_name=repo_name,
+                issue_id=issue_id,
+                comment_body=comment_body,
             )